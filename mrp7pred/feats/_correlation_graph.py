@@ -8,70 +8,17 @@ import pandas as pd
 import numpy as np
 from numpy import ndarray
 from pandas import DataFrame
-from typing import List, Dict
-from sklearn import datasets  # for test
+from typing import List, Union
 
-
-class Node(object):
-    def __init__(self, value: int):
-        """
-        A simple node class
-
-        Attributes
-        --------
-        value: int
-            Node value
-        edge: Dict[Node, int]
-            Edges stored in a dictionary with neighbor node as keys
-            and PCC as values
-        """
-        self.value = value  # node value
-        self.edge: Dict[Node, float] = dict()
-
-    def link(self, node: Node, pcc: float) -> None:
-        """
-        Link a new node to current node
-        """
-        self.edge[node] = pcc
-
-    def unlink(self, node: Node) -> None:
-        """
-        Remove a neighbor
-        """
-        if not self.edge.get(node):
-            raise ValueError(f"{node.value} is not the neighbor of {self.value}")
-        del node.edge[self]  # remove self from node's neighbor
-        del self.edge[node]  # remove node from self's neighbor
-
-    def _is_alone(self) -> bool:
-        """
-        Return true if current node has no neighbor
-        """
-        return len(self.edge) == 0
-
-    def has_leaf_child(self) -> bool:
-        """
-        Check if current node has leaf child
-        """
-        if self._is_alone():
-            return False
-        for neighbor in self.edge.keys():
-            if len(neighbor.edge) == 1:
-                return True
-        return False
-
-    def get_overall_weight(self) -> float:
-        """
-        Calculate sum of connected edges
-        """
-        return sum(self.edge.values())
+from mrp7pred.feats._prune_numba import HAS_NUMBA, _prune_csr
 
 
 class CorrelationGraph(object):
     """
-    The CorrelationGraph class is composed of Node classes.
     Initialization will build a non-directed graph based on given
-    correlation matrix.
+    correlation matrix. The graph is stored in CSR layout (indptr,
+    indices, weights), nodes are removed by flipping the `alive` mask
+    and updating the `degree` vector.
     The goal is to remove as many high-colinear features while
     keeping as many total features as possible.
 
@@ -132,40 +79,55 @@ class CorrelationGraph(object):
     iterated will be removed (R1)
     """
 
-    def __init__(self, corr_matrix: DataFrame, threshold: float = 0.9):
+    def __init__(self, corr_matrix: Union[DataFrame, ndarray], threshold: float = 0.9):
         """
         Initialize graph
 
         Parameters
         --------
-        corr_matric: DataFrame
-            n * n DataFrame
+        corr_matric: Union[DataFrame, ndarray]
+            n * n correlation matrix, absolute values are taken here
         threshold: float
             threshold to remove features
         """
-        if corr_matrix.shape[0] != corr_matrix.shape[1]:
-            raise ValueError(
-                f"Input dataframe should be (n, n), got {corr_matrix.shape}"
-            )
-
-        self.nodes: List[Node] = []
+        mat: ndarray = np.asarray(corr_matrix)
+        if mat.ndim != 2 or mat.shape[0] != mat.shape[1]:
+            raise ValueError(f"Input dataframe should be (n, n), got {mat.shape}")
+
+        n = mat.shape[0]
+        # only the upper triangle is needed, the matrix is symmetric
+        iu = np.triu_indices_from(mat, k=1)
+        vals = np.abs(mat[iu])
+        # compare in the input precision, only store the kept PCC as float32
+        mask = vals >= threshold
+        rows, cols = iu[0][mask], iu[1][mask]
+        weights = vals[mask].astype(np.float32)
+
+        # store both directions of every edge in CSR layout:
+        # neighbors of node i are indices[indptr[i]:indptr[i + 1]]
+        src = np.concatenate([rows, cols])
+        dst = np.concatenate([cols, rows])
+        order = np.argsort(src, kind="stable")
+        self.indptr: ndarray = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self.indptr[1:])
+        self.indices: ndarray = dst[order].astype(np.int64)
+        self.weights: ndarray = np.concatenate([weights, weights])[order]
+
+        # degree and sum of PCC of every node, updated on node removal
+        self.degree: ndarray = np.diff(self.indptr)
+        self.wsum: ndarray = np.bincount(
+            src[order], weights=self.weights, minlength=n
+        ).astype(np.float64)
+        self.alive: ndarray = np.ones(n, dtype=bool)
         self.to_drop: List[int] = []
-        self.num_edges: int = 0
-        for row in range(corr_matrix.shape[0]):
-            node = Node(row)
-            if node not in self.nodes:
-                self.nodes.append(node)
-            for col in range(row + 1, corr_matrix.shape[1]):
-                if col >= corr_matrix.shape[1]:
-                    continue
-                corr = corr_matrix.iloc[row, col]
-                if corr >= threshold:
-                    node_new = Node(col)
-                    node.link(node_new, corr)
-                    node_new.link(node, corr)
-                    self.num_edges += 1
-                    if node_new not in self.nodes:
-                        self.nodes.append(node_new)
+        self.num_edges: int = int(mask.sum())
+
+    def _neighbors(self, i: int) -> ndarray:
+        """
+        Return the neighbors of node i which are still in the graph
+        """
+        neighbors = self.indices[self.indptr[i] : self.indptr[i + 1]]
+        return neighbors[self.alive[neighbors]]
 
     def _print_graph(self) -> None:
         """
@@ -174,53 +136,59 @@ class CorrelationGraph(object):
         v1 -(0.99)- v3
         v2 -(0.94)- v1
         """
-        for node in self.nodes:
-            for neighbor in node.edge.keys():
-                print(f"{node.value} -({node.edge[neighbor]})- {neighbor.value}")
+        for i in np.flatnonzero(self.alive):
+            start, end = self.indptr[i], self.indptr[i + 1]
+            for neighbor, pcc in zip(self.indices[start:end], self.weights[start:end]):
+                if self.alive[neighbor]:
+                    print(f"{i} -({pcc})- {neighbor}")
 
-    def _remove_node(self, node: Node) -> None:
+    def _remove_node(self, i: int) -> None:
         """
         Remove a node from graph
         """
-        if node not in self.nodes:
-            raise ValueError(f"Node '{node.value}' is not the graph")
-        if node._is_alone():
+        if not self.alive[i]:
+            raise ValueError(f"Node '{i}' is not the graph")
+        self.alive[i] = False
+        if self.degree[i] == 0:
             # only remove from graph, not drop this feature
-            self.nodes.remove(node)
             return
-        for neighbor in node.edge.copy().keys():
-            neighbor.unlink(node)
-            self.num_edges -= 1
-        self.nodes.remove(node)
-        if node.value not in self.to_drop:
-            self.to_drop.append(node.value)
+        start, end = self.indptr[i], self.indptr[i + 1]
+        neighbors = self.indices[start:end]
+        mask = self.alive[neighbors]
+        neighbors = neighbors[mask]
+        self.degree[neighbors] -= 1
+        self.wsum[neighbors] -= self.weights[start:end][mask]
+        self.degree[i] = 0
+        self.wsum[i] = 0.0
+        self.num_edges -= len(neighbors)
+        self.to_drop.append(int(i))
+
+    def _has_leaf_child(self, i: int) -> bool:
+        """
+        Check if node i has leaf child
+        """
+        return bool((self.degree[self._neighbors(i)] == 1).any())
 
     def _remove_nodes_with_leaf_child(self) -> None:
         """
         Remove nodes with leaf child
         """
         # R1
-        for node in self.nodes:
-            if node._is_alone() or node.has_leaf_child():
-                self._remove_node(node)
+        for i in np.flatnonzero(self.alive):
+            if not self.alive[i]:
+                continue
+            if self.degree[i] == 0 or self._has_leaf_child(i):
+                self._remove_node(i)
 
     def _remove_nodes_in_cycles(self) -> None:
         """
         Remove the node with maximum sum of PCC in cycles or pairs
         """
         # R2
-        max_weight = 0.0
-        max_weight_node = Node(-1)  # place holder
-        for node in self.nodes:
-            if node._is_alone():
-                self._remove_node(node)
-            # if the node has no neighbor then remove from graph
-            sum_weight = sum(node.edge.values())
-            if sum_weight > max_weight:
-                max_weight_node = node
-                max_weight = sum_weight
-        if max_weight_node.value != -1:
-            self._remove_node(max_weight_node)
+        if self.num_edges == 0:
+            return
+        candidates = np.where(self.alive & (self.degree > 0), self.wsum, -np.inf)
+        self._remove_node(int(np.argmax(candidates)))
 
     def prune(self) -> List[int]:
         """
@@ -228,7 +196,22 @@ class CorrelationGraph(object):
         Cannot use traversing algorithms like BFS, since the graph is
         probabily not fullly connected
         Here we loop through all nodes
-        """
+
+        The numba kernel in `_prune_numba` is used if numba is installed,
+        otherwise fall back to the pure-Python R1/R2 methods
+        """
+        if HAS_NUMBA:
+            dropped = _prune_csr(
+                self.indptr,
+                self.indices,
+                self.weights,
+                self.alive,
+                self.degree,
+                self.wsum,
+            )
+            self.to_drop.extend(dropped.tolist())
+            self.num_edges = 0
+            return self.to_drop
         while self.num_edges != 0:
             self._remove_nodes_with_leaf_child()
             self._remove_nodes_in_cycles()
@@ -236,6 +219,8 @@ class CorrelationGraph(object):
 
 
 if __name__ == "__main__":
+    from sklearn import datasets  # for test
+
     iris = datasets.load_iris()
     X = iris.data
     y = iris.target
@@ -246,7 +231,7 @@ if __name__ == "__main__":
 
     # create correlation matrix
     print("Correlation matrix ... ")
-    correlation_matrix = df.corr().abs()
+    correlation_matrix = df.corr()
     print(correlation_matrix)
 
     cg = CorrelationGraph(correlation_matrix, threshold=0.95)
@@ -0,0 +1,126 @@
+"""
+Numba kernel for pruning the CSR correlation graph
+
+Same R1/R2 iterations as CorrelationGraph.prune(), written over typed
+numpy arrays only so it can be compiled with numba.njit
+"""
+
+import numpy as np
+from numpy import ndarray
+
+try:
+    from numba import njit
+
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """
+        No-op decorator used when numba is not installed
+        """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def _remove_node_csr(
+    i: int,
+    indptr: ndarray,
+    indices: ndarray,
+    weights: ndarray,
+    alive: ndarray,
+    degree: ndarray,
+    wsum: ndarray,
+) -> int:
+    """
+    Remove node i and return the number of edges removed with it
+    """
+    alive[i] = False
+    removed = 0
+    for k in range(indptr[i], indptr[i + 1]):
+        j = indices[k]
+        if alive[j]:
+            degree[j] -= 1
+            wsum[j] -= weights[k]
+            removed += 1
+    degree[i] = 0
+    wsum[i] = 0.0
+    return removed
+
+
+@njit(cache=True)
+def _prune_csr(
+    indptr: ndarray,
+    indices: ndarray,
+    weights: ndarray,
+    alive: ndarray,
+    degree: ndarray,
+    wsum: ndarray,
+) -> ndarray:
+    """
+    Repeat R1 and R2 on a CSR graph until no edge exists
+
+    Parameters
+    --------
+    indptr, indices, weights: ndarray
+        CSR arrays of the thresholded correlation graph
+    alive: ndarray
+        Boolean mask of nodes still in the graph, updated in place
+    degree: ndarray
+        Number of alive neighbors of each node, updated in place
+    wsum: ndarray
+        Sum of PCC to alive neighbors of each node, updated in place
+
+    Returns
+    --------
+    to_drop: ndarray
+        Indices of dropped nodes, in the order they were removed
+    """
+    n = alive.shape[0]
+    num_edges = 0
+    for i in range(n):
+        if alive[i]:
+            num_edges += degree[i]
+    num_edges //= 2
+
+    to_drop = np.empty(n, dtype=np.int64)
+    n_drop = 0
+    while num_edges != 0:
+        # R1
+        for i in range(n):
+            if not alive[i]:
+                continue
+            if degree[i] == 0:
+                # only remove from graph, not drop this feature
+                alive[i] = False
+                continue
+            has_leaf_child = False
+            for k in range(indptr[i], indptr[i + 1]):
+                j = indices[k]
+                if alive[j] and degree[j] == 1:
+                    has_leaf_child = True
+                    break
+            if has_leaf_child:
+                num_edges -= _remove_node_csr(
+                    i, indptr, indices, weights, alive, degree, wsum
+                )
+                to_drop[n_drop] = i
+                n_drop += 1
+
+        # R2
+        if num_edges == 0:
+            break
+        max_weight_node = -1
+        max_weight = -np.inf
+        for i in range(n):
+            if alive[i] and degree[i] > 0 and wsum[i] > max_weight:
+                max_weight_node = i
+                max_weight = wsum[i]
+        num_edges -= _remove_node_csr(
+            max_weight_node, indptr, indices, weights, alive, degree, wsum
+        )
+        to_drop[n_drop] = max_weight_node
+        n_drop += 1
+    return to_drop[:n_drop]
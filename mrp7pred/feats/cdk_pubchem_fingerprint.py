@@ -1,23 +1,70 @@
 """
 Generate 881-bit pubchem molecular fingerprint via cdk
+
+Fingerprints are packed into 14 uint64 words (896 bits >= 881 bits), so
+similarity between two fingerprints is a popcount over 14 words
 """
 
 from numpy import ndarray
 import numpy as np
 
-# from PyFingerprint.All_Fingerprint import get_fingerprint
+try:
+    from PyFingerprint.All_Fingerprint import get_fingerprint
+except ImportError:  # pragma: no cover
+    get_fingerprint = None
 
 import warnings
 
 warnings.filterwarnings("ignore")
 
+N_BITS = 881
+N_WORDS = (N_BITS + 63) // 64
+
+
+def _pack_bits(idx_ones: ndarray) -> ndarray:
+    """
+    Pack indices of on-bits into N_WORDS uint64 words
+    """
+    words, bits = np.divmod(np.asarray(idx_ones, dtype=np.uint64), np.uint64(64))
+    packed = np.zeros(N_WORDS, dtype=np.uint64)
+    np.bitwise_or.at(packed, words.astype(np.intp), np.left_shift(np.uint64(1), bits))
+    return packed
+
+
+def _unpack_bits(packed: ndarray) -> ndarray:
+    """
+    Unpack a packed fingerprint into N_BITS 0/1 values
+    """
+    bits = np.unpackbits(packed.astype("<u8").view(np.uint8), bitorder="little")
+    return bits[:N_BITS]
+
+
+def _popcount(packed: ndarray) -> int:
+    """
+    Number of on-bits in a packed fingerprint
+    """
+    return int(np.unpackbits(packed.view(np.uint8)).sum())
+
+
+def _tanimoto(fp_a: ndarray, fp_b: ndarray) -> float:
+    """
+    Tanimoto similarity between two packed fingerprints
+    """
+    union = _popcount(np.bitwise_or(fp_a, fp_b))
+    if union == 0:
+        return 0.0
+    return _popcount(np.bitwise_and(fp_a, fp_b)) / union
+
 
 def _pubchem_fingerprint(smi: str) -> ndarray:
     """
-    Get the 881-bit PubChem molecular finger print from smiles
+    Get the 881-bit PubChem molecular finger print from smiles,
+    packed into N_WORDS uint64 words
     """
-    # pubchem_fp = np.zeros(881)
-    # idx_ones = get_fingerprint(smi, fp_type="pubchem")
-    # pubchem_fp[idx_ones] = 1
-    # return pubchem_fp
-    pass
+    if get_fingerprint is None:
+        raise ImportError(
+            "PubChem fingerprint requires PyFingerprint: "
+            "pip install git+https://github.com/hcji/PyFingerprint@master"
+        )
+    idx_ones = get_fingerprint(smi, fp_type="pubchem")
+    return _pack_bits(idx_ones)
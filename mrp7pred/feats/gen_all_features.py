@@ -190,6 +190,11 @@ def featurize(
         )
 
     # signal.alarm(0)
+    if df_feats.empty:
+        # every compound failed, there are no columns to select from
+        print(f"Featurization failed for all {len(failed)} compounds")
+        return np.arange(0), df_feats
+
     selected_features_id = np.arange(len(df_feats.columns))
 
     # extract numeric columns
@@ -40,6 +40,8 @@ from typing import Union, Dict, List, Tuple, Callable
 from pandas import DataFrame
 from numpy import ndarray
 
+import logging
+
 import pandas as pd
 import numpy as np
 
@@ -48,6 +50,8 @@ from mrp7pred.feats._correlation_graph import CorrelationGraph
 # from mrp7pred.feats.params import FEATURE_SELECTION_PARAMS
 from mrp7pred.utils import DummyClassifier
 
+logger = logging.getLogger(__name__)
+
 
 def _remove_low_variance_features(
     X: Union[ndarray, DataFrame], threshold=0.0
@@ -66,11 +70,10 @@ def _remove_all_zero_features(
     """
     Remove all zero features
     """
-    print("Remove features with all zeros ... ", end="", flush=True)
+    logger.info("Remove features with all zeros ...")
     mask = (X == 0).all()
     support_zero = np.where(~mask)[0]
-    print("Done!")
-    print(f"Selected {len(support_zero)}/{len(X.columns)} features")
+    logger.info(f"Selected {len(support_zero)}/{len(X.columns)} features")
     return support_zero, X.iloc[:, support_zero]
 
 
@@ -94,17 +97,16 @@ def _remove_similar_features(
     support: List[int]
         List of column indices remained
     """
-    print("Calculating correlation matrix ... ", end="", flush=True)
+    logger.info("Calculating correlation matrix ...")
     if isinstance(X, ndarray):
         X = pd.DataFrame(X)
-    correlation_matrix = X.corr().abs()
-    print("Done!")
-    print("Creating correlation graph ... ", end="", flush=True)
+    # CorrelationGraph takes the absolute values of the upper triangle only
+    correlation_matrix = X.corr()
+    logger.info("Creating correlation graph ...")
     cg = CorrelationGraph(correlation_matrix, threshold=threshold)
-    print("Done!")
     to_drop = cg.prune()
     support = list(set(range(X.shape[1])) - set(to_drop))
-    print(f"Selected {len(support)}/{len(X.columns)} features")
+    logger.info(f"Selected {len(support)}/{len(X.columns)} features")
     return np.array(support), X.drop(X.columns[to_drop], axis=1)
 
 
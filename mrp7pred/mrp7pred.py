@@ -2,16 +2,20 @@
 MRP7Pred class
 """
 
-import pickle
+import hashlib
+import importlib.util
+import logging
+import os
+import warnings
+
+import joblib
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from numpy import ndarray
-from sklearn.pipeline import Pipeline
-from typing import Optional, Union, Dict, Any, List, Callable
+from typing import Optional, Union, Dict, Any, List, Callable, Tuple
 
 # from mrp7pred.featurization import featurize
-from mrp7pred.feats.gen_all_features import featurize
-from mrp7pred.train import run
 from mrp7pred.utils import (
     DATA,
     MODEL_DIR,
@@ -26,6 +30,72 @@ from mrp7pred.utils import (
 
 # warnings.filterwarnings("ignore")
 
+logger = logging.getLogger(__name__)
+
+
+def _feats_cache_key(df: DataFrame) -> str:
+    """
+    Hash of compound names and smiles, in order
+    """
+    lines = (df["name"].astype(str) + "\t" + df["smiles"].astype(str)).str.cat(sep="\n")
+    return hashlib.blake2b(lines.encode(), digest_size=16).hexdigest()
+
+
+def _check_parquet_engine() -> None:
+    """
+    Caching features needs pyarrow, check before featurizing anything
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(
+            "Caching features to 'feats_cache_dir' requires pyarrow: "
+            "pip install pyarrow"
+        )
+
+
+def _featurize(
+    df: DataFrame,
+    prefix: Optional[str] = None,
+    feats_cache_dir: Optional[str] = None,
+) -> DataFrame:
+    """
+    Featurize compounds for prediction
+    If feats_cache_dir is given, features of previously seen compounds are
+    loaded from "{feats_cache_dir}/{hash}.parquet" instead
+    """
+    if feats_cache_dir is not None:
+        cache_path = f"{feats_cache_dir}/{_feats_cache_key(df)}.parquet"
+        if os.path.exists(cache_path):
+            logger.info(f"Loading cached features from: {cache_path}")
+            return pd.read_parquet(cache_path, engine="pyarrow")
+
+    from mrp7pred.feats.gen_all_features import featurize
+
+    # df_feats should be purely numeric
+    _, df_feats = featurize(df, remove_similar=False, remove_zeros=False, prefix=prefix)
+    if df_feats.empty:
+        # every compound in this chunk failed
+        return df_feats
+    # features as the float32 used by predict, whether cached or not
+    feat_cols = df_feats.columns.drop(["name", "smiles"])
+    df_feats = df_feats.astype({col: np.float32 for col in feat_cols})
+    if feats_cache_dir is not None:
+        ensure_folder(feats_cache_dir)
+        df_feats.to_parquet(cache_path, engine="pyarrow")
+    return df_feats
+
+
+def _to_array(df: DataFrame, feature_cols: pd.Index) -> ndarray:
+    """
+    Feature matrix of a featurized chunk with columns "name" and "smiles",
+    columns in the order of feature_cols
+    """
+    df_feat = df.drop(["name", "smiles"], axis=1)
+    if not df_feat.columns.equals(feature_cols):
+        # chunks are featurized separately, align to the first chunk's layout
+        df_feat = df_feat.reindex(columns=feature_cols)
+    # float32 is what tree ensembles use internally, convert only once
+    return np.ascontiguousarray(df_feat.to_numpy(dtype=np.float32))
+
 
 class MRP7Pred(object):
     def __init__(
@@ -44,10 +114,10 @@ class MRP7Pred(object):
         if not train_new:
             if clf_dir is None:
                 raise ValueError("'clf_dir' cannot be None if not training new model.")
-            print("Loading trained model ... ", end="", flush=True)
-            with open(clf_dir, "rb") as ci:
-                self.clf_best = pickle.load(ci)
-            print("Done!")
+            logger.info("Loading trained model ...")
+            # arrays saved by joblib.dump are memory-mapped instead of copied,
+            # models saved with plain pickle are loaded as before
+            self.clf_best = joblib.load(clf_dir, mmap_mode="r")
 
     def auto_train_test(
         self,
@@ -110,6 +180,9 @@ class MRP7Pred(object):
                 "MRP7Pred was instantiated with train_new=False, execute training process will overwrite the previous model!"
             )
 
+        # imported here so that prediction does not pay the training imports
+        from mrp7pred.train import run
+
         self.clf_best = run(
             df,
             grid=grid,
@@ -125,6 +198,45 @@ class MRP7Pred(object):
             time_limit=time_limit,
         )
 
+    def _predict_batch(
+        self, parallel: joblib.Parallel, batch: List[Tuple[DataFrame, ndarray]]
+    ) -> List[DataFrame]:
+        """
+        Predict a batch of (names and smiles, feature array) chunks
+
+        Pipelines fitted on DataFrames get plain float32 arrays here, so
+        sklearn's "X does not have valid feature names" warning is silenced,
+        columns are aligned by _to_array() instead
+        """
+        # featurize() forks a process per compound, so chunks are featurized
+        # and converted in the calling thread, the worker threads only run
+        # predict_proba() on the arrays of one batch
+        with warnings.catch_warnings():
+            # filters are process wide, the calling thread holds them until
+            # every worker is done
+            warnings.filterwarnings(
+                "ignore",
+                message="X does not have valid feature names",
+                category=UserWarning,
+            )
+            probas = parallel(
+                joblib.delayed(self.clf_best.predict_proba)(X) for _, X in batch
+            )
+        return [
+            pd.DataFrame(
+                {
+                    "name": df_names["name"].to_numpy(),
+                    "smiles": df_names["smiles"].to_numpy(),
+                    # derive labels from probabilities, no extra predict()
+                    "pred": self.clf_best.classes_[proba.argmax(axis=1)],
+                    "score": proba[:, 1],
+                },
+                index=df_names.index,
+                copy=False,
+            )
+            for (df_names, _), proba in zip(batch, probas)
+        ]
+
     def predict(
         self,
         compound_csv_dir: Optional[str] = None,
@@ -132,6 +244,10 @@ class MRP7Pred(object):
         featurized_df: Optional[DataFrame] = None,
         prefix: Optional[str] = None,
         out_dir: Optional[str] = None,
+        chunk_size: int = 4096,
+        n_jobs: int = 1,
+        feats_cache_dir: Optional[str] = None,
+        keep_features: bool = False,
     ) -> DataFrame:
         """
         Featurize data and make predictions
@@ -147,6 +263,18 @@ class MRP7Pred(object):
             Featurized data in dataframe
         prefix: Optional[str]
             Prediction results output filename prefix
+        chunk_size: int
+            Number of compounds featurized and predicted at a time
+        n_jobs: int
+            Number of threads predicting chunks in parallel, keep 1 if
+            the classifier is already multi-threaded (e.g. xgboost),
+            at most n_jobs feature arrays are alive at a time
+        feats_cache_dir: Optional[str]
+            Directory to cache generated features as parquet files,
+            e.g. mrp7pred.utils.FEAT_CACHE, features are not cached if None
+        keep_features: bool
+            Keep all generated features in self.featurized_df, otherwise
+            features are dropped once their chunk is predicted
 
         Returns
         --------
@@ -172,42 +300,66 @@ class MRP7Pred(object):
                 raise ValueError(
                     'The input csv should have these two columns: ["name", "smiles"]'
                 )
-
-            # only extract name and smiles
-            df = featurized_df[["name", "smiles"]]
-            df_feat = featurized_df.drop(["name", "smiles"], axis=1)
+            df = featurized_df
 
         if featurized_df is None:
-            print("Generating features ... ")
-            # df_feats should be purely numeric
-            _, df = featurize(
-                df, remove_similar=False, remove_zeros=False, prefix=prefix
+            if feats_cache_dir is not None:
+                _check_parquet_engine()
+            # featurize() drops duplicates per call, do it once for all chunks
+            df = df.drop_duplicates(subset=["smiles"])
+            logger.info("Generating features ...")
+
+        logger.info("Start predicting ...")
+        feature_cols = None
+        featurized_chunks = []
+        out_chunks = []
+        batch = []
+        batch_size = joblib.effective_n_jobs(n_jobs)
+        with joblib.Parallel(n_jobs=n_jobs, backend="threading") as parallel:
+            for start in range(0, len(df), chunk_size):
+                chunk = df.iloc[start : start + chunk_size]
+                if featurized_df is None:
+                    chunk = _featurize(
+                        chunk, prefix=prefix, feats_cache_dir=feats_cache_dir
+                    )
+                    if chunk.empty:
+                        continue
+                    if keep_features:
+                        featurized_chunks.append(chunk)
+                if feature_cols is None:
+                    feature_cols = chunk.columns.drop(["name", "smiles"])
+                # only names and smiles are kept once the chunk is converted
+                batch.append(
+                    (chunk[["name", "smiles"]], _to_array(chunk, feature_cols))
+                )
+                if len(batch) == batch_size:
+                    # drop the batch's arrays once they are predicted
+                    out_chunks.extend(self._predict_batch(parallel, batch))
+                    batch = []
+            out_chunks.extend(self._predict_batch(parallel, batch))
+
+        if featurized_df is None and keep_features:
+            self.featurized_df = (
+                pd.concat(featurized_chunks, ignore_index=True)
+                if featurized_chunks
+                else DataFrame(columns=["name", "smiles"])
             )
-            self.featurized_df = df
-            df_feat = df.drop(["name", "smiles"], axis=1)
-            # print("Done!")
-        print("Start predicting ... ", end="", flush=True)
-        preds = self.clf_best.predict(df_feat)
-        scores = [score[1] for score in self.clf_best.predict_proba(df_feat)]
-        print("Done!")
-
-        df_out = pd.DataFrame(columns=["name", "smiles", "pred", "score"])
-        df_out["name"] = df["name"]
-        df_out["smiles"] = df["smiles"]
-        df_out["pred"] = preds
-        df_out["score"] = scores
+
+        df_out = DataFrame(columns=["name", "smiles", "pred", "score"])
+        if out_chunks:
+            # featurize() returns a new RangeIndex for each chunk
+            df_out = pd.concat(out_chunks, ignore_index=featurized_df is None)
 
         if out_dir is not None:
-            print("Writing output ... ", end="", flush=True)
             ensure_folder(out_dir)
-            df_out.to_csv(f"{out_dir}/{prefix}predicted_{get_current_time()}.csv")
-            print(
-                f"Done! Results saved to: {out_dir}/{prefix}predicted_{get_current_time()}.csv"
-            )
+            out_path = f"{out_dir}/{prefix}predicted_{get_current_time()}.csv"
+            df_out.to_csv(out_path)
+            logger.info(f"Results saved to: {out_path}")
         return df_out
 
 
 def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     m7p = MRP7Pred()
     m7p.predict(f"{DATA}/unknown.csv")
 
@@ -2,7 +2,17 @@
 Something wierd happened here: if renaming this file as "cdk_pubchem_fp_test.py", pytest will fail.
 """
 
-from mrp7pred.feats.cdk_pubchem_fingerprint import _pubchem_fingerprint
+import numpy as np
+import pytest
+
+from mrp7pred.feats.cdk_pubchem_fingerprint import (
+    N_BITS,
+    N_WORDS,
+    _pack_bits,
+    _unpack_bits,
+    _tanimoto,
+    _pubchem_fingerprint,
+)
 from mrp7pred.utils import standardize_smiles
 
 import warnings
@@ -11,6 +21,16 @@ warnings.filterwarnings("ignore")
 
 
 def test_cdk_pubchem_fingerprint():
+    pytest.importorskip("PyFingerprint.All_Fingerprint")
     smiles = standardize_smiles("CCCCN")
     pubchem_fp = _pubchem_fingerprint(smiles)
-    assert pubchem_fp.shape == (881,)
\ No newline at end of file
+    assert pubchem_fp.shape == (N_WORDS,)
+    assert pubchem_fp.dtype == np.uint64
+
+
+def test_packed_fingerprint_bit_ops():
+    fp_a = _pack_bits([0, 63, 64, 880])
+    fp_b = _pack_bits([0, 64, 100])
+    assert _unpack_bits(fp_a).shape == (N_BITS,)
+    assert np.flatnonzero(_unpack_bits(fp_a)).tolist() == [0, 63, 64, 880]
+    assert _tanimoto(fp_a, fp_b) == 2 / 5
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+
+import mrp7pred.feats._correlation_graph as correlation_graph
+from mrp7pred.feats._correlation_graph import CorrelationGraph
+
+
+def _example_corr_matrix() -> pd.DataFrame:
+    """
+    Correlation matrix from the CorrelationGraph docstring
+    """
+    corr = np.zeros((5, 5))
+    for row, col, pcc in [
+        (1, 0, 0.11),
+        (2, 0, 0.93),
+        (2, 1, 0.96),
+        (3, 0, 0.54),
+        (3, 1, 0.99),
+        (3, 2, 1.00),
+        (4, 0, 0.75),
+        (4, 1, 0.95),
+        (4, 2, 0.44),
+        (4, 3, 0.92),
+    ]:
+        corr[row, col] = corr[col, row] = pcc
+    return pd.DataFrame(corr, columns=list("ABCDE"))
+
+
+def test_graph_construction() -> None:
+    # every feature is a single node, shared by all of its edges
+    cg = CorrelationGraph(_example_corr_matrix(), threshold=0.9)
+    assert cg.num_edges == 6
+    assert cg.degree.tolist() == [1, 3, 3, 3, 2]
+    assert sorted(cg.indices[cg.indptr[2] : cg.indptr[3]]) == [0, 1, 3]
+
+
+def test_graph_signed_ndarray_input() -> None:
+    # negative correlations are as colinear as positive ones
+    corr = _example_corr_matrix().to_numpy(copy=True)
+    corr[3, 1] = corr[1, 3] = -0.99
+    cg = CorrelationGraph(corr, threshold=0.9)
+    assert cg.num_edges == 6
+    assert cg.prune() == [2, 1, 3]
+
+
+def test_graph_threshold_boundary() -> None:
+    # threshold is inclusive and compared in the input precision
+    for threshold in (0.9, np.float64(0.9)):
+        assert CorrelationGraph([[1, 0.9], [0.9, 1]], threshold).num_edges == 1
+        below = [[1, 0.89999999], [0.89999999, 1]]
+        assert CorrelationGraph(below, threshold).num_edges == 0
+    cg = CorrelationGraph(np.array([[1, -0.9], [-0.9, 1]]), threshold=0.9)
+    assert cg.weights.dtype == np.float32
+
+
+def test_prune_docstring_example(monkeypatch) -> None:
+    # C (leaf child A), then B (max PCC in cycle B-D-E), then D
+    for has_numba in (False, True):
+        monkeypatch.setattr(correlation_graph, "HAS_NUMBA", has_numba)
+        cg = CorrelationGraph(_example_corr_matrix(), threshold=0.9)
+        assert cg.prune() == [2, 1, 3]
+        assert cg.num_edges == 0
+
+
+def test_prune_zero_pcc_edges(monkeypatch) -> None:
+    # threshold 0.0 links every pair, including pairs with PCC == 0.0
+    for has_numba in (False, True):
+        monkeypatch.setattr(correlation_graph, "HAS_NUMBA", has_numba)
+        cg = CorrelationGraph(pd.DataFrame(np.eye(4)), threshold=0.0)
+        assert cg.num_edges == 6
+        assert len(cg.prune()) == 3
+        assert cg.num_edges == 0
+        assert (cg.degree == 0).all()
+
+
+if __name__ == "__main__":
+    cg = CorrelationGraph(_example_corr_matrix(), threshold=0.9)
+    print(cg.prune())
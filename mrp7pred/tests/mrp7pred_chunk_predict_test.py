@@ -0,0 +1,182 @@
+import importlib.util
+import os
+import sys
+import threading
+import time
+import types
+import warnings
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from mrp7pred.mrp7pred import MRP7Pred, _featurize, _feats_cache_key
+
+
+def _stub_featurize(X, **kwargs):
+    """
+    Stand-in for gen_all_features.featurize(): smiles "X" fails,
+    features are returned with object dtype like the real featurizer
+    """
+    rows = [
+        {"n_c": smi.count("C"), "length": len(smi), "name": name, "smiles": smi}
+        for name, smi in zip(X["name"], X["smiles"])
+        if smi != "X"
+    ]
+    return None, pd.DataFrame(rows).astype(object)
+
+
+def _stub_model() -> MRP7Pred:
+    X = np.array([[i, i] for i in range(1, 9)], dtype=np.float32)
+    y = (X[:, 0] > 4).astype(int)
+    m7p = MRP7Pred(train_new=True)
+    m7p.clf_best = RandomForestClassifier(n_estimators=5, random_state=0).fit(X, y)
+    return m7p
+
+
+def _patch_featurize(monkeypatch) -> list:
+    """
+    Replace featurize() with _stub_featurize(), return the list of its calls
+    """
+    calls = []
+
+    def featurize(X, **kwargs):
+        calls.append(len(X))
+        return _stub_featurize(X, **kwargs)
+
+    module = types.ModuleType("mrp7pred.feats.gen_all_features")
+    module.featurize = featurize
+    monkeypatch.setitem(sys.modules, "mrp7pred.feats.gen_all_features", module)
+    return calls
+
+
+def test_predict_skips_chunk_where_all_compounds_fail(monkeypatch) -> None:
+    _patch_featurize(monkeypatch)
+    df = pd.DataFrame(
+        {"name": list("abcde"), "smiles": ["C", "CC", "CCC", "CCCC", "X"]}
+    )
+    m7p = _stub_model()
+    full = m7p.predict(compound_df=df, chunk_size=4096)
+    chunked = m7p.predict(compound_df=df, chunk_size=2, n_jobs=2, keep_features=True)
+    assert chunked["name"].tolist() == list("abcd")
+    pd.testing.assert_frame_equal(chunked, full)
+    assert len(m7p.featurized_df) == 4
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_predict_bounds_alive_feature_arrays(monkeypatch, n_jobs) -> None:
+    _patch_featurize(monkeypatch)
+    m7p = _stub_model()
+    clf = m7p.clf_best
+    live_arrays = []
+    lock = threading.Lock()
+
+    def predict_proba(X):
+        # only the arrays of the current batch may still be alive
+        with lock:
+            live_arrays.append(weakref.ref(X))
+            assert sum(ref() is not None for ref in live_arrays) <= n_jobs
+        time.sleep(0.01)
+        return clf.predict_proba(X)
+
+    m7p.clf_best = types.SimpleNamespace(
+        classes_=clf.classes_, predict_proba=predict_proba
+    )
+    df = pd.DataFrame(
+        {"name": list("abcdef"), "smiles": ["C" * i for i in range(1, 7)]}
+    )
+    out = m7p.predict(compound_df=df, chunk_size=1, n_jobs=n_jobs)
+    assert len(live_arrays) == 6
+    assert len(out) == 6
+    assert m7p.featurized_df is None
+
+
+def test_predict_aligns_feature_columns_across_chunks(monkeypatch) -> None:
+    calls = _patch_featurize(monkeypatch)
+    module = sys.modules["mrp7pred.feats.gen_all_features"]
+    featurize = module.featurize
+
+    def featurize_swapped(X, **kwargs):
+        _, df_feats = featurize(X, **kwargs)
+        # the second chunk comes back with its feature columns swapped
+        if len(calls) == 2:
+            df_feats = df_feats[["length", "n_c", "name", "smiles"]]
+        return None, df_feats
+
+    module.featurize = featurize_swapped
+    df = pd.DataFrame(
+        {"name": list("abcd"), "smiles": ["C", "CCCC", "CO" + "O" * 8, "CCCCO"]}
+    )
+    m7p = _stub_model()
+    # label depends on n_c only, length would flip it if columns were swapped
+    m7p.clf_best = RandomForestClassifier(n_estimators=5, random_state=0).fit(
+        np.array([[1, 1], [1, 10], [4, 4], [4, 40]]), [0, 0, 1, 1]
+    )
+    chunked = m7p.predict(compound_df=df, chunk_size=2)
+    assert calls == [2, 2]
+    assert chunked["pred"].tolist() == [0, 1, 0, 1]
+
+
+def test_predict_no_feature_name_warning(monkeypatch) -> None:
+    _patch_featurize(monkeypatch)
+    m7p = _stub_model()
+    # fitted on a DataFrame, predicted on the float32 arrays of each chunk
+    X = pd.DataFrame({"n_c": range(1, 9), "length": range(1, 9)})
+    m7p.clf_best.fit(X, (X["n_c"] > 4).astype(int))
+    df = pd.DataFrame({"name": list("abc"), "smiles": ["C", "CC", "CCCCCC"]})
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        out = m7p.predict(compound_df=df, chunk_size=2, n_jobs=2)
+    assert out["pred"].tolist() == [0, 0, 1]
+
+
+def test_predict_all_compounds_fail(monkeypatch) -> None:
+    _patch_featurize(monkeypatch)
+    df = pd.DataFrame({"name": ["a"], "smiles": ["X"]})
+    out = _stub_model().predict(compound_df=df, chunk_size=2)
+    assert out.empty
+    assert out.columns.tolist() == ["name", "smiles", "pred", "score"]
+
+
+def test_feats_cache_key() -> None:
+    df = pd.DataFrame({"name": ["a", "b"], "smiles": ["C", "CC"]})
+    assert _feats_cache_key(df) == _feats_cache_key(df.copy())
+    # row order and names are part of the key
+    assert _feats_cache_key(df) != _feats_cache_key(df.iloc[::-1])
+    assert _feats_cache_key(df) != _feats_cache_key(df.assign(name=["a", "c"]))
+
+
+def test_featurize_cache_hit_and_miss(monkeypatch, tmp_path) -> None:
+    pytest.importorskip("pyarrow")
+    calls = _patch_featurize(monkeypatch)
+    df = pd.DataFrame({"name": ["a", "b"], "smiles": ["C", "CC"]})
+    cache_dir = str(tmp_path / "feat_cache")
+
+    uncached = _featurize(df)
+    miss = _featurize(df, feats_cache_dir=cache_dir)
+    assert calls == [2, 2]
+    assert os.listdir(cache_dir) == [f"{_feats_cache_key(df)}.parquet"]
+
+    hit = _featurize(df, feats_cache_dir=cache_dir)
+    assert calls == [2, 2]
+    for df_feats in (miss, hit):
+        pd.testing.assert_frame_equal(df_feats, uncached, check_dtype=False)
+        assert (df_feats.dtypes[["n_c", "length"]] == np.float32).all()
+    assert (uncached.dtypes[["n_c", "length"]] == np.float32).all()
+
+
+def test_predict_cache_needs_parquet_engine(monkeypatch, tmp_path) -> None:
+    calls = _patch_featurize(monkeypatch)
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(
+        importlib.util,
+        "find_spec",
+        lambda name, *args: None if name == "pyarrow" else find_spec(name, *args),
+    )
+    df = pd.DataFrame({"name": ["a"], "smiles": ["C"]})
+    with pytest.raises(ImportError, match="pyarrow"):
+        _stub_model().predict(compound_df=df, feats_cache_dir=str(tmp_path))
+    # fails before any compound is featurized
+    assert calls == []
@@ -2,9 +2,9 @@
 Main training script
 """
 
-import pickle
 from typing import Union, Any, Dict, List, Optional
 
+import joblib
 import pandas as pd
 from pandas import DataFrame
 from numpy import ndarray
@@ -144,8 +144,8 @@ def run(
     if model_dir is None:
         model_dir = f"{OUTPUT}/model"
     pkl_name = f"{model_dir}/{prefix}best_model_{get_current_time()}.pkl"
-    with open(pkl_name, "wb") as mo:
-        pickle.dump(clf_best, mo)
+    # uncompressed so that MRP7Pred can memory-map the arrays on load
+    joblib.dump(clf_best, pkl_name, compress=0)
     print(f"Best model saved to: {pkl_name}")
 
     print("Evaluate model on test data ... ", end="", flush=True)
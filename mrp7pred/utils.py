@@ -43,6 +43,7 @@ DATA = "../data"
 OUTPUT = "../output"
 MODEL_DIR = f"{OUTPUT}/model"
 FIG_DIR = f"{OUTPUT}/fig"
+FEAT_CACHE = f"{OUTPUT}/feat_cache"
 
 
 def standardize_smiles(smiles: str) -> str:
@@ -273,6 +274,10 @@ class DummyClassifier(BaseEstimator):
     def predict_proba(self, X: ndarray, y=None) -> ndarray:
         return self.estimator.predict_proba(X)
 
+    @property
+    def classes_(self) -> ndarray:
+        return self.estimator.classes_
+
     def score(self, X: ndarray, y: ndarray) -> float:
         """
         Mean accuracy
@@ -311,4 +316,6 @@ class FeatureSelector(BaseEstimator, TransformerMixin):
         return self
 
     def transform(self, X: Union[DataFrame, ndarray]) -> Union[DataFrame, ndarray]:
+        if isinstance(X, ndarray):
+            return X[:, self.selected_feature_id]
         return X.iloc[:, self.selected_feature_id]
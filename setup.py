@@ -20,5 +20,11 @@ setup(
         # "PyFingerprint @ git+https://github.com/hcji/PyFingerprint@master",
         "jpype1",
     ],
+    extras_require={
+        # speeds up CorrelationGraph.prune()
+        "numba": ["numba"],
+        # caching features in MRP7Pred.predict()
+        "parquet": ["pyarrow"],
+    },
     python_requires=">=3.7",
 )
\ No newline at end of file